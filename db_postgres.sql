@@ -0,0 +1,301 @@
+-- PostgreSQL profili (db.sql / init_sqlite.py şemasından uyarlanmıştır)
+-- Kullanım:
+--   createdb clinic
+--   psql -d clinic -f db_postgres.sql
+--   DATABASE_URL=postgresql+psycopg2://<user>:<pass>@localhost/clinic uvicorn main:app --workers 4
+
+DROP TABLE IF EXISTS Search_Index, Doctor_Removal_Jobs, Archive_State, Idempotency_Keys, Reminder_Outbox, Waitlist, Appointments_Archive, Appointments, Time_Slots,
+    Appointment_Status, Doctor_Working_Hours, Doctors, Patients, Users, Roles CASCADE;
+
+-- --- TABLES ---
+
+CREATE TABLE Roles (
+    role_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    role_name VARCHAR(20) NOT NULL UNIQUE
+);
+
+CREATE TABLE Users (
+    user_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    email VARCHAR(100) NOT NULL UNIQUE,
+    password VARCHAR(255) NOT NULL,
+    role_id INTEGER NOT NULL REFERENCES Roles(role_id),
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE Patients (
+    patient_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES Users(user_id),
+    phone VARCHAR(20)
+);
+
+CREATE TABLE Doctors (
+    doctor_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id INTEGER NOT NULL UNIQUE REFERENCES Users(user_id),
+    expertise VARCHAR(100) NOT NULL,
+    is_active BOOLEAN DEFAULT TRUE,
+    slot_minutes INTEGER NOT NULL DEFAULT 30 CHECK (slot_minutes > 0),
+    appointment_minutes INTEGER NOT NULL DEFAULT 30 CHECK (appointment_minutes > 0)
+);
+
+-- MySQL'deki ENUM yerine CHECK kısıtı; uygulama gün ismini Python'da hesaplar
+CREATE TABLE Doctor_Working_Hours (
+    working_hour_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    doctor_id INTEGER NOT NULL REFERENCES Doctors(doctor_id),
+    day_of_week VARCHAR(3) NOT NULL
+        CHECK (day_of_week IN ('Mon','Tue','Wed','Thu','Fri','Sat','Sun')),
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    CONSTRAINT chk_working_hours CHECK (start_time < end_time),
+    CONSTRAINT uq_doctor_day UNIQUE (doctor_id, day_of_week)
+);
+
+CREATE TABLE Appointment_Status (
+    status_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    status_name VARCHAR(20) NOT NULL UNIQUE
+);
+
+CREATE TABLE Time_Slots (
+    slot_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    CONSTRAINT chk_time_slot CHECK (start_time < end_time)
+);
+
+CREATE TABLE Appointments (
+    appointment_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    patient_id INTEGER NOT NULL REFERENCES Patients(patient_id),
+    doctor_id INTEGER NOT NULL REFERENCES Doctors(doctor_id),
+    slot_id INTEGER REFERENCES Time_Slots(slot_id),
+    appointment_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    status_id INTEGER NOT NULL REFERENCES Appointment_Status(status_id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT chk_appointment_time CHECK (start_time < end_time),
+    CONSTRAINT uq_doctor_date_slot UNIQUE (doctor_id, appointment_date, slot_id),
+    CONSTRAINT uq_patient_date_slot UNIQUE (patient_id, appointment_date, slot_id)
+);
+
+-- Hasta / doktor randevu listeleri için covering indeksler
+CREATE INDEX idx_appt_patient_date ON Appointments (patient_id, appointment_date, start_time) INCLUDE (end_time, slot_id, doctor_id, status_id);
+CREATE INDEX idx_appt_doctor_date ON Appointments (doctor_id, appointment_date, start_time) INCLUDE (end_time, slot_id, patient_id, status_id);
+CREATE INDEX idx_appt_date ON Appointments (appointment_date);
+
+-- Silinen doktorların / eski randevuların taşındığı arşiv tablosu
+CREATE TABLE Appointments_Archive (
+    appointment_id INTEGER PRIMARY KEY,
+    patient_id INTEGER NOT NULL,
+    doctor_id INTEGER NOT NULL,
+    slot_id INTEGER,
+    appointment_date DATE NOT NULL,
+    start_time TIME NOT NULL,
+    end_time TIME NOT NULL,
+    status_id INTEGER NOT NULL,
+    created_at TIMESTAMP,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_archive_patient_date ON Appointments_Archive (patient_id, appointment_date);
+CREATE INDEX idx_archive_doctor_date ON Appointments_Archive (doctor_id, appointment_date);
+CREATE INDEX idx_archive_date ON Appointments_Archive (appointment_date);
+
+-- Periyodik arşivleme işinin kullandığı en yeni cutoff (tek satır)
+CREATE TABLE Archive_State (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    cutoff_date DATE
+);
+
+-- Bekleme listesi: iptal edilen saatler sıradaki (waitlist_id) uygun hastaya verilir
+CREATE TABLE Waitlist (
+    waitlist_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    patient_id INTEGER NOT NULL REFERENCES Patients(patient_id),
+    doctor_id INTEGER NOT NULL REFERENCES Doctors(doctor_id),
+    from_date DATE NOT NULL,
+    to_date DATE NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'waiting'
+        CHECK (status IN ('waiting','promoted','cancelled')),
+    promoted_appointment_id INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_waitlist_queue ON Waitlist (doctor_id, waitlist_id) WHERE status = 'waiting';
+CREATE INDEX idx_waitlist_patient ON Waitlist (patient_id);
+
+-- Randevu hatırlatmaları için outbox: dış gönderici sent_at IS NULL kayıtları okur
+CREATE TABLE Reminder_Outbox (
+    outbox_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    appointment_id INTEGER NOT NULL UNIQUE,
+    recipient VARCHAR(100) NOT NULL,
+    payload TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP
+);
+
+CREATE INDEX idx_outbox_pending ON Reminder_Outbox (outbox_id) WHERE sent_at IS NULL;
+
+-- Arka planda çalışan doktor silme işleri (tüm worker'lar tarafından görülür)
+CREATE TABLE Doctor_Removal_Jobs (
+    job_id VARCHAR(32) PRIMARY KEY,
+    doctor_id INTEGER NOT NULL,
+    email VARCHAR(100) NOT NULL,
+    status VARCHAR(10) NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'completed', 'failed')),
+    total_appointments INTEGER NOT NULL DEFAULT 0,
+    archived_appointments INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    heartbeat_at DOUBLE PRECISION
+);
+CREATE INDEX idx_removal_jobs_open ON Doctor_Removal_Jobs (doctor_id) WHERE status IN ('queued', 'running');
+
+-- POST /appointments ve /register için Idempotency-Key cevapları (IDEMPOTENCY_PERSIST=1)
+CREATE TABLE Idempotency_Keys (
+    idem_key VARCHAR(300) PRIMARY KEY,
+    fingerprint CHAR(64) NOT NULL,
+    status_code INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    created_at DOUBLE PRECISION NOT NULL
+);
+
+CREATE INDEX idx_idempotency_created ON Idempotency_Keys (created_at);
+
+-- --- ARAMA İNDEKSİ ---
+-- SQLite'daki FTS5 tablosunun karşılığı: GIN indeksli tsvector kolonu.
+-- Noktalama işaretleri (@ . -) boşluğa çevrilir ki email / telefon parçaları aranabilsin.
+CREATE TABLE Search_Index (
+    user_id INTEGER PRIMARY KEY,
+    first_name TEXT,
+    last_name TEXT,
+    email TEXT,
+    phone TEXT,
+    expertise TEXT,
+    document tsvector GENERATED ALWAYS AS (
+        to_tsvector('simple', regexp_replace(
+            coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' ||
+            coalesce(email, '') || ' ' || coalesce(phone, '') || ' ' || coalesce(expertise, ''),
+            '\W', ' ', 'g'))
+    ) STORED
+);
+
+CREATE INDEX idx_search_document ON Search_Index USING GIN (document);
+
+CREATE OR REPLACE FUNCTION fn_search_users() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO Search_Index (user_id, first_name, last_name, email)
+        VALUES (NEW.user_id, NEW.first_name, NEW.last_name, NEW.email);
+    ELSIF TG_OP = 'UPDATE' THEN
+        UPDATE Search_Index SET first_name = NEW.first_name, last_name = NEW.last_name, email = NEW.email
+        WHERE user_id = NEW.user_id;
+    ELSE
+        DELETE FROM Search_Index WHERE user_id = OLD.user_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_search_patients() RETURNS trigger AS $$
+BEGIN
+    UPDATE Search_Index SET phone = NEW.phone WHERE user_id = NEW.user_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION fn_search_doctors() RETURNS trigger AS $$
+BEGIN
+    UPDATE Search_Index SET expertise = NEW.expertise WHERE user_id = NEW.user_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_search_users AFTER INSERT OR UPDATE OF first_name, last_name, email OR DELETE ON Users
+    FOR EACH ROW EXECUTE FUNCTION fn_search_users();
+CREATE TRIGGER trg_search_patients AFTER INSERT OR UPDATE OF phone ON Patients
+    FOR EACH ROW EXECUTE FUNCTION fn_search_patients();
+CREATE TRIGGER trg_search_doctors AFTER INSERT OR UPDATE OF expertise ON Doctors
+    FOR EACH ROW EXECUTE FUNCTION fn_search_doctors();
+
+-- --- INSERT DATA ---
+
+INSERT INTO Roles (role_name) VALUES ('patient'), ('doctor'), ('secretary'), ('admin');
+
+INSERT INTO Appointment_Status (status_name) VALUES ('scheduled'), ('cancelled'), ('completed');
+
+INSERT INTO Time_Slots (start_time, end_time) VALUES
+('09:00:00','09:30:00'),
+('09:30:00','10:00:00'),
+('10:00:00','10:30:00'),
+('10:30:00','11:00:00'),
+('11:00:00','11:30:00'),
+('11:30:00','12:00:00'),
+('13:00:00','13:30:00'),
+('13:30:00','14:00:00'),
+('14:00:00','14:30:00'),
+('14:30:00','15:00:00');
+
+INSERT INTO Users (email, password, role_id, first_name, last_name)
+SELECT 'admin@clinic.com', 'admin', role_id, 'System', 'Admin' FROM Roles WHERE role_name = 'admin';
+
+INSERT INTO Users (email, password, role_id, first_name, last_name)
+SELECT 'secretary@clinic.com', 'secretary', role_id, 'Clinic', 'Secretary' FROM Roles WHERE role_name = 'secretary';
+
+-- Doktorlar
+INSERT INTO Users (email, password, role_id, first_name, last_name)
+SELECT v.email, '12345', r.role_id, v.fname, v.lname
+FROM (VALUES
+    ('dr.smith@clinic.com', 'John', 'Smith'),
+    ('dr.brown@clinic.com', 'Emily', 'Brown'),
+    ('dr.jones@clinic.com', 'Michael', 'Jones'),
+    ('dr.wilson@clinic.com', 'Sarah', 'Wilson')
+) AS v(email, fname, lname)
+CROSS JOIN Roles r WHERE r.role_name = 'doctor';
+
+INSERT INTO Doctors (user_id, expertise)
+SELECT u.user_id, v.expertise
+FROM (VALUES
+    ('dr.smith@clinic.com', 'kardiyoloji'),
+    ('dr.brown@clinic.com', 'cildiye'),
+    ('dr.jones@clinic.com', 'noroloji'),
+    ('dr.wilson@clinic.com', 'ortopedi')
+) AS v(email, expertise)
+JOIN Users u ON u.email = v.email;
+
+INSERT INTO Doctor_Working_Hours (doctor_id, day_of_week, start_time, end_time)
+SELECT d.doctor_id, v.day, v.start_time::time, v.end_time::time
+FROM (VALUES
+    ('dr.smith@clinic.com', 'Mon', '09:00:00', '12:00:00'),
+    ('dr.smith@clinic.com', 'Tue', '09:00:00', '12:00:00'),
+    ('dr.smith@clinic.com', 'Wed', '09:00:00', '12:00:00'),
+    ('dr.brown@clinic.com', 'Mon', '10:00:00', '13:00:00'),
+    ('dr.brown@clinic.com', 'Thu', '10:00:00', '13:00:00'),
+    ('dr.brown@clinic.com', 'Fri', '10:00:00', '13:00:00'),
+    ('dr.jones@clinic.com', 'Tue', '08:30:00', '11:30:00'),
+    ('dr.jones@clinic.com', 'Wed', '08:30:00', '11:30:00'),
+    ('dr.jones@clinic.com', 'Thu', '08:30:00', '11:30:00'),
+    ('dr.wilson@clinic.com', 'Mon', '11:00:00', '15:00:00'),
+    ('dr.wilson@clinic.com', 'Wed', '11:00:00', '15:00:00'),
+    ('dr.wilson@clinic.com', 'Fri', '11:00:00', '15:00:00')
+) AS v(email, day, start_time, end_time)
+JOIN Users u ON u.email = v.email
+JOIN Doctors d ON d.user_id = u.user_id;
+
+-- Hastalar
+INSERT INTO Users (email, password, role_id, first_name, last_name)
+SELECT v.email, '12345', r.role_id, v.fname, v.lname
+FROM (VALUES
+    ('alice@mail.com', 'Alice', 'Johnson'),
+    ('bob@mail.com', 'Bob', 'Williams')
+) AS v(email, fname, lname)
+CROSS JOIN Roles r WHERE r.role_name = 'patient';
+
+INSERT INTO Patients (user_id, phone)
+SELECT u.user_id, v.phone
+FROM (VALUES
+    ('alice@mail.com', '555-1001'),
+    ('bob@mail.com', '555-1002')
+) AS v(email, phone)
+JOIN Users u ON u.email = v.email;
@@ -50,6 +50,8 @@ CREATE TABLE Doctors (
     user_id INTEGER NOT NULL UNIQUE,
     expertise TEXT NOT NULL,
     is_active BOOLEAN DEFAULT 1,
+    slot_minutes INTEGER NOT NULL DEFAULT 30,        -- boş saat listesindeki adım
+    appointment_minutes INTEGER NOT NULL DEFAULT 30, -- varsayılan muayene süresi
     FOREIGN KEY (user_id) REFERENCES Users(user_id)
 );
 """)
@@ -86,8 +88,10 @@ CREATE TABLE Appointments (
     appointment_id INTEGER PRIMARY KEY AUTOINCREMENT,
     patient_id INTEGER NOT NULL,
     doctor_id INTEGER NOT NULL,
-    slot_id INTEGER NOT NULL,
+    slot_id INTEGER, -- eski sabit Time_Slots randevuları için, serbest saatlerde NULL
     appointment_date DATE NOT NULL,
+    start_time TEXT NOT NULL, -- HH:MM:SS
+    end_time TEXT NOT NULL,
     status_id INTEGER NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (patient_id) REFERENCES Patients(patient_id),
@@ -99,6 +103,169 @@ CREATE TABLE Appointments (
 );
 """)
 
+# Hasta / doktor randevu listeleri için covering indeksler: liste sorguları
+# tabloya dönmeden doğrudan indeksten okunur (appointment_id = rowid).
+# Doktor/gün başına start_time sıralı olduğu için çakışma kontrolü de bu indeksi kullanır.
+cursor.execute("CREATE INDEX idx_appt_patient_date ON Appointments (patient_id, appointment_date, start_time, end_time, doctor_id, status_id);")
+cursor.execute("CREATE INDEX idx_appt_doctor_date ON Appointments (doctor_id, appointment_date, start_time, end_time, patient_id, status_id);")
+
+# Çakışma kontrolünün veritabanı tarafındaki karşılığı: uygulama kontrolü atlansa
+# (ör. başka bir süreç) bile aynı doktora kesişen iki aktif randevu yazılamaz.
+cursor.execute("""
+CREATE TRIGGER trg_appt_no_overlap BEFORE INSERT ON Appointments
+WHEN NEW.status_id != (SELECT status_id FROM Appointment_Status WHERE status_name = 'cancelled')
+ AND EXISTS (
+    SELECT 1 FROM Appointments a
+    WHERE a.doctor_id = NEW.doctor_id AND a.appointment_date = NEW.appointment_date
+      AND a.start_time < NEW.end_time AND a.end_time > NEW.start_time
+      AND a.status_id != (SELECT status_id FROM Appointment_Status WHERE status_name = 'cancelled')
+)
+BEGIN
+    SELECT RAISE(ABORT, 'Bu saat dolu (Overlap detected!)');
+END;
+""")
+
+# Arşivleme işinin eski randevuları tarihe göre bulabilmesi için
+cursor.execute("CREATE INDEX idx_appt_date ON Appointments (appointment_date);")
+
+# Silinen doktorların / eski randevuların taşındığı arşiv tablosu.
+# Doktor kaydı silinebildiği için burada foreign key tutmuyoruz.
+cursor.execute("""
+CREATE TABLE Appointments_Archive (
+    appointment_id INTEGER PRIMARY KEY,
+    patient_id INTEGER NOT NULL,
+    doctor_id INTEGER NOT NULL,
+    slot_id INTEGER,
+    appointment_date DATE NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    status_id INTEGER NOT NULL,
+    created_at TIMESTAMP,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+""")
+
+# Arşivden geçmiş sorguları ve "bu aralıkta arşiv kaydı var mı" kontrolü için
+cursor.execute("CREATE INDEX idx_archive_patient_date ON Appointments_Archive (patient_id, appointment_date);")
+cursor.execute("CREATE INDEX idx_archive_doctor_date ON Appointments_Archive (doctor_id, appointment_date);")
+cursor.execute("CREATE INDEX idx_archive_date ON Appointments_Archive (appointment_date);")
+
+# Periyodik arşivleme işinin kullandığı en yeni cutoff (tek satır).
+# Bu tarihten eski randevular arşivde olabilir; daha yeniler sadece
+# doktor silme / iptal edilen slotun yeniden alınması ile arşive düşer.
+cursor.execute("""
+CREATE TABLE Archive_State (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    cutoff_date DATE
+);
+""")
+
+# Bekleme listesi: iptal edilen saatler sıradaki (waitlist_id) uygun hastaya verilir
+cursor.execute("""
+CREATE TABLE Waitlist (
+    waitlist_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER NOT NULL,
+    doctor_id INTEGER NOT NULL,
+    from_date DATE NOT NULL,
+    to_date DATE NOT NULL,
+    status TEXT NOT NULL DEFAULT 'waiting', -- 'waiting','promoted','cancelled'
+    promoted_appointment_id INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (patient_id) REFERENCES Patients(patient_id),
+    FOREIGN KEY (doctor_id) REFERENCES Doctors(doctor_id)
+);
+""")
+# Sadece bekleyen kayıtları içeren öncelik sırası indeksi
+cursor.execute("CREATE INDEX idx_waitlist_queue ON Waitlist (doctor_id, waitlist_id) WHERE status = 'waiting';")
+cursor.execute("CREATE INDEX idx_waitlist_patient ON Waitlist (patient_id);")
+
+# Randevu hatırlatmaları için outbox: dış gönderici sent_at IS NULL kayıtları okur
+cursor.execute("""
+CREATE TABLE Reminder_Outbox (
+    outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    appointment_id INTEGER NOT NULL UNIQUE,
+    recipient TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP
+);
+""")
+cursor.execute("CREATE INDEX idx_outbox_pending ON Reminder_Outbox (outbox_id) WHERE sent_at IS NULL;")
+
+# Arka planda çalışan doktor silme işleri. Durum tabloda tutulduğu için her
+# worker sorgulayabilir; yarıda kalan işler heartbeat_at eskiyince devam ettirilir.
+cursor.execute("""
+CREATE TABLE Doctor_Removal_Jobs (
+    job_id TEXT PRIMARY KEY,
+    doctor_id INTEGER NOT NULL,
+    email TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued', -- 'queued','running','completed','failed'
+    total_appointments INTEGER NOT NULL DEFAULT 0,
+    archived_appointments INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    heartbeat_at REAL
+);
+""")
+cursor.execute("CREATE INDEX idx_removal_jobs_open ON Doctor_Removal_Jobs (doctor_id) WHERE status IN ('queued', 'running');")
+
+# POST /appointments ve /register için Idempotency-Key cevapları
+# (main.py'de IDEMPOTENCY_PERSIST=1 olduğunda kullanılır)
+cursor.execute("""
+CREATE TABLE Idempotency_Keys (
+    idem_key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    status_code INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+""")
+cursor.execute("CREATE INDEX idx_idempotency_created ON Idempotency_Keys (created_at);")
+
+# --- ARAMA İNDEKSİ (FTS5) ---
+# Sekreter ekranındaki hasta/doktor seçicileri için typeahead araması.
+# rowid = Users.user_id; tablo aşağıdaki trigger'lar ile senkron tutulur.
+cursor.execute("""
+CREATE VIRTUAL TABLE Search_Index USING fts5(
+    first_name, last_name, email, phone, expertise,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+""")
+
+cursor.executescript("""
+CREATE TRIGGER trg_search_users_ins AFTER INSERT ON Users BEGIN
+    INSERT INTO Search_Index (rowid, first_name, last_name, email)
+    VALUES (new.user_id, new.first_name, new.last_name, new.email);
+END;
+
+CREATE TRIGGER trg_search_users_upd AFTER UPDATE OF first_name, last_name, email ON Users BEGIN
+    UPDATE Search_Index SET first_name = new.first_name, last_name = new.last_name, email = new.email
+    WHERE rowid = new.user_id;
+END;
+
+CREATE TRIGGER trg_search_users_del AFTER DELETE ON Users BEGIN
+    DELETE FROM Search_Index WHERE rowid = old.user_id;
+END;
+
+CREATE TRIGGER trg_search_patients_ins AFTER INSERT ON Patients BEGIN
+    UPDATE Search_Index SET phone = new.phone WHERE rowid = new.user_id;
+END;
+
+CREATE TRIGGER trg_search_patients_upd AFTER UPDATE OF phone ON Patients BEGIN
+    UPDATE Search_Index SET phone = new.phone WHERE rowid = new.user_id;
+END;
+
+CREATE TRIGGER trg_search_doctors_ins AFTER INSERT ON Doctors BEGIN
+    UPDATE Search_Index SET expertise = new.expertise WHERE rowid = new.user_id;
+END;
+
+CREATE TRIGGER trg_search_doctors_upd AFTER UPDATE OF expertise ON Doctors BEGIN
+    UPDATE Search_Index SET expertise = new.expertise WHERE rowid = new.user_id;
+END;
+""")
+
 # --- INSERT DATA ---
 
 # Roles
@@ -0,0 +1,284 @@
+"""
+Var olan clinic.db'yi verileri silmeden güncel şemaya taşır.
+
+init_sqlite.py veritabanını sıfırdan oluşturur (eski dosyayı siler); bu script
+ise eski şemayla oluşturulmuş bir veritabanına eksik tablo / kolon / indeksleri
+ekler. Her adım önce mevcut durumu kontrol eder, bu yüzden tekrar tekrar
+çalıştırılabilir. main.py de SQLite ile açılırken bunu otomatik çalıştırır.
+
+    python migrate_sqlite.py [clinic.db]
+"""
+import sqlite3
+import sys
+
+DB_NAME = "clinic.db"
+
+APPOINTMENT_COLUMNS = "appointment_id, patient_id, doctor_id, slot_id, appointment_date, start_time, end_time, status_id, created_at"
+
+
+def table_exists(cursor, name):
+    return cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+def column_names(cursor, table):
+    return [r[1] for r in cursor.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def migrate_doctors(cursor):
+    # Doktor başına slot adımı ve varsayılan muayene süresi
+    cols = column_names(cursor, "Doctors")
+    if "slot_minutes" not in cols:
+        cursor.execute("ALTER TABLE Doctors ADD COLUMN slot_minutes INTEGER NOT NULL DEFAULT 30")
+    if "appointment_minutes" not in cols:
+        cursor.execute("ALTER TABLE Doctors ADD COLUMN appointment_minutes INTEGER NOT NULL DEFAULT 30")
+
+
+def migrate_appointments(cursor):
+    # slot_id artık boş olabildiği ve start_time / end_time NOT NULL eklendiği için
+    # SQLite'ta tablo yeniden oluşturulur; saatler eski kayıtların Time_Slots'undan gelir.
+    if "start_time" in column_names(cursor, "Appointments"):
+        return
+    cursor.execute("""
+    CREATE TABLE Appointments_New (
+        appointment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        patient_id INTEGER NOT NULL,
+        doctor_id INTEGER NOT NULL,
+        slot_id INTEGER,
+        appointment_date DATE NOT NULL,
+        start_time TEXT NOT NULL,
+        end_time TEXT NOT NULL,
+        status_id INTEGER NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (patient_id) REFERENCES Patients(patient_id),
+        FOREIGN KEY (doctor_id) REFERENCES Doctors(doctor_id),
+        FOREIGN KEY (slot_id) REFERENCES Time_Slots(slot_id),
+        FOREIGN KEY (status_id) REFERENCES Appointment_Status(status_id),
+        UNIQUE (doctor_id, appointment_date, slot_id),
+        UNIQUE (patient_id, appointment_date, slot_id)
+    );
+    """)
+    cursor.execute(f"""
+        INSERT INTO Appointments_New ({APPOINTMENT_COLUMNS})
+        SELECT a.appointment_id, a.patient_id, a.doctor_id, a.slot_id, a.appointment_date,
+               ts.start_time, ts.end_time, a.status_id, a.created_at
+        FROM Appointments a
+        JOIN Time_Slots ts ON a.slot_id = ts.slot_id
+    """)
+    old_count = cursor.execute("SELECT COUNT(*) FROM Appointments").fetchone()[0]
+    new_count = cursor.execute("SELECT COUNT(*) FROM Appointments_New").fetchone()[0]
+    if old_count != new_count:
+        raise RuntimeError(f"{old_count - new_count} randevunun slot_id'si Time_Slots'ta yok, taşıma durduruldu.")
+    cursor.execute("DROP TABLE Appointments")
+    cursor.execute("ALTER TABLE Appointments_New RENAME TO Appointments")
+
+
+def migrate_archive(cursor):
+    if table_exists(cursor, "Appointments_Archive") and "start_time" not in column_names(cursor, "Appointments_Archive"):
+        # user-036 öncesi arşiv: saatleri Time_Slots'tan doldurup yeniden oluştur
+        cursor.execute("ALTER TABLE Appointments_Archive RENAME TO Appointments_Archive_Old")
+        cursor.execute("DROP INDEX IF EXISTS idx_archive_patient_date")
+        cursor.execute("DROP INDEX IF EXISTS idx_archive_doctor_date")
+        cursor.execute("DROP INDEX IF EXISTS idx_archive_date")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Appointments_Archive (
+        appointment_id INTEGER PRIMARY KEY,
+        patient_id INTEGER NOT NULL,
+        doctor_id INTEGER NOT NULL,
+        slot_id INTEGER,
+        appointment_date DATE NOT NULL,
+        start_time TEXT NOT NULL,
+        end_time TEXT NOT NULL,
+        status_id INTEGER NOT NULL,
+        created_at TIMESTAMP,
+        archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+    if table_exists(cursor, "Appointments_Archive_Old"):
+        cursor.execute(f"""
+            INSERT INTO Appointments_Archive ({APPOINTMENT_COLUMNS}, archived_at)
+            SELECT a.appointment_id, a.patient_id, a.doctor_id, a.slot_id, a.appointment_date,
+                   ts.start_time, ts.end_time, a.status_id, a.created_at, a.archived_at
+            FROM Appointments_Archive_Old a
+            JOIN Time_Slots ts ON a.slot_id = ts.slot_id
+        """)
+        cursor.execute("DROP TABLE Appointments_Archive_Old")
+
+    if not table_exists(cursor, "Archive_State"):
+        cursor.execute("""
+        CREATE TABLE Archive_State (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            cutoff_date DATE
+        );
+        """)
+        # Cutoff bilinmediği için arşivdeki en yeni tarih güvenli bir üst sınırdır
+        cursor.execute("INSERT INTO Archive_State (id, cutoff_date) SELECT 1, MAX(appointment_date) FROM Appointments_Archive")
+
+
+def create_indexes(cursor):
+    # Eski (slot_id tabanlı) covering indeksler yeni kolon düzeniyle değiştirilir
+    for name, table, cols in [
+        ("idx_appt_patient_date", "Appointments", "patient_id, appointment_date, start_time, end_time, doctor_id, status_id"),
+        ("idx_appt_doctor_date", "Appointments", "doctor_id, appointment_date, start_time, end_time, patient_id, status_id"),
+    ]:
+        existing = [r[2] for r in cursor.execute(f"PRAGMA index_info({name})").fetchall()]
+        if existing != [c.strip() for c in cols.split(",")]:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+            cursor.execute(f"CREATE INDEX {name} ON {table} ({cols})")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_appt_date ON Appointments (appointment_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_archive_patient_date ON Appointments_Archive (patient_id, appointment_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_archive_doctor_date ON Appointments_Archive (doctor_id, appointment_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_archive_date ON Appointments_Archive (appointment_date)")
+
+
+def create_overlap_trigger(cursor):
+    # Aynı doktora kesişen iki aktif randevu yazılmasını veritabanında engelle
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_appt_no_overlap BEFORE INSERT ON Appointments
+    WHEN NEW.status_id != (SELECT status_id FROM Appointment_Status WHERE status_name = 'cancelled')
+     AND EXISTS (
+        SELECT 1 FROM Appointments a
+        WHERE a.doctor_id = NEW.doctor_id AND a.appointment_date = NEW.appointment_date
+          AND a.start_time < NEW.end_time AND a.end_time > NEW.start_time
+          AND a.status_id != (SELECT status_id FROM Appointment_Status WHERE status_name = 'cancelled')
+    )
+    BEGIN
+        SELECT RAISE(ABORT, 'Bu saat dolu (Overlap detected!)');
+    END;
+    """)
+
+
+def create_new_tables(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Waitlist (
+        waitlist_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        patient_id INTEGER NOT NULL,
+        doctor_id INTEGER NOT NULL,
+        from_date DATE NOT NULL,
+        to_date DATE NOT NULL,
+        status TEXT NOT NULL DEFAULT 'waiting',
+        promoted_appointment_id INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (patient_id) REFERENCES Patients(patient_id),
+        FOREIGN KEY (doctor_id) REFERENCES Doctors(doctor_id)
+    );
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_waitlist_queue ON Waitlist (doctor_id, waitlist_id) WHERE status = 'waiting'")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_waitlist_patient ON Waitlist (patient_id)")
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Reminder_Outbox (
+        outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        appointment_id INTEGER NOT NULL UNIQUE,
+        recipient TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        sent_at TIMESTAMP
+    );
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_outbox_pending ON Reminder_Outbox (outbox_id) WHERE sent_at IS NULL")
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Idempotency_Keys (
+        idem_key TEXT PRIMARY KEY,
+        fingerprint TEXT NOT NULL,
+        status_code INTEGER NOT NULL,
+        body TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_idempotency_created ON Idempotency_Keys (created_at)")
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS Doctor_Removal_Jobs (
+        job_id TEXT PRIMARY KEY,
+        doctor_id INTEGER NOT NULL,
+        email TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        total_appointments INTEGER NOT NULL DEFAULT 0,
+        archived_appointments INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        started_at TIMESTAMP,
+        finished_at TIMESTAMP,
+        heartbeat_at REAL
+    );
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_removal_jobs_open ON Doctor_Removal_Jobs (doctor_id) WHERE status IN ('queued', 'running')")
+
+
+def create_search_index(cursor):
+    # FTS5 arama indeksi ve trigger'ları; mevcut kullanıcılarla doldurulur
+    if table_exists(cursor, "Search_Index"):
+        return
+    cursor.execute("""
+    CREATE VIRTUAL TABLE Search_Index USING fts5(
+        first_name, last_name, email, phone, expertise,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    );
+    """)
+    cursor.execute("""
+        INSERT INTO Search_Index (rowid, first_name, last_name, email, phone, expertise)
+        SELECT u.user_id, u.first_name, u.last_name, u.email, p.phone, d.expertise
+        FROM Users u
+        LEFT JOIN Patients p ON u.user_id = p.user_id
+        LEFT JOIN Doctors d ON u.user_id = d.user_id
+    """)
+    for trigger in [
+        """CREATE TRIGGER IF NOT EXISTS trg_search_users_ins AFTER INSERT ON Users BEGIN
+            INSERT INTO Search_Index (rowid, first_name, last_name, email)
+            VALUES (new.user_id, new.first_name, new.last_name, new.email);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_search_users_upd AFTER UPDATE OF first_name, last_name, email ON Users BEGIN
+            UPDATE Search_Index SET first_name = new.first_name, last_name = new.last_name, email = new.email
+            WHERE rowid = new.user_id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_search_users_del AFTER DELETE ON Users BEGIN
+            DELETE FROM Search_Index WHERE rowid = old.user_id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_search_patients_ins AFTER INSERT ON Patients BEGIN
+            UPDATE Search_Index SET phone = new.phone WHERE rowid = new.user_id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_search_patients_upd AFTER UPDATE OF phone ON Patients BEGIN
+            UPDATE Search_Index SET phone = new.phone WHERE rowid = new.user_id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_search_doctors_ins AFTER INSERT ON Doctors BEGIN
+            UPDATE Search_Index SET expertise = new.expertise WHERE rowid = new.user_id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_search_doctors_upd AFTER UPDATE OF expertise ON Doctors BEGIN
+            UPDATE Search_Index SET expertise = new.expertise WHERE rowid = new.user_id;
+        END""",
+    ]:
+        cursor.execute(trigger)
+
+
+def migrate(db_path=DB_NAME):
+    """Tüm adımları tek bir yazma transaction'ı içinde uygula"""
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    try:
+        # Tablo yeniden oluşturulurken foreign key kontrolü kapalı olmalı (transaction dışında ayarlanır)
+        conn.execute("PRAGMA foreign_keys = OFF")
+        cursor = conn.cursor()
+        # Birden fazla worker aynı anda açılırsa sadece biri migrate eder, diğerleri bekler
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            migrate_doctors(cursor)
+            migrate_appointments(cursor)
+            migrate_archive(cursor)
+            create_indexes(cursor)
+            create_overlap_trigger(cursor)
+            create_new_tables(cursor)
+            create_search_index(cursor)
+            problems = cursor.execute("PRAGMA foreign_key_check(Appointments)").fetchall()
+            if problems:
+                raise RuntimeError(f"Foreign key hatası: {problems[:5]}")
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    migrate(sys.argv[1] if len(sys.argv) > 1 else DB_NAME)
+    print("SQLite database migrated successfully.")